@@ -1,10 +1,15 @@
 """This module contains an implementation of the required orchestrator class."""
 from __future__ import annotations
 
+import io
 import logging
 import os
+import re
+import select
+import tarfile
 import time
-from re import match
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, List, Optional
 
 import paramiko
@@ -12,20 +17,36 @@ from botocore.config import Config
 from scp import SCPClient
 
 from settings import (
-    LOGGING_LEVEL,
     PERFORM_MEASUREMENTS_BASH_SCRIPT,
     RESULTS_FILENAME,
     SETUP_CRON_BASH_SCRIPT,
 )
 from utilities import (
-    EC2,
     AWSEC2FreeTierAMIs,
     DefaultAMIUsernames,
     InstanceOperationsMeasurements,
+    InstanceRecord,
     InstanceToCreate,
 )
+from utilities import logging_setup  # noqa: F401  pylint: disable=unused-import
 
-logging.basicConfig(level=LOGGING_LEVEL)
+# Imported from the submodule directly - the lazy __getattr__ re-export in the package __init__
+# exists for formatter-only importers, and aws_ec2 itself defers the boto3 import to first use
+from utilities.aws_ec2 import EC2
+
+# Compiled once as the pattern is applied to every line of every results file
+RESULTS_LINE_REGEX = re.compile(r"([A-Z]+): ([0-9]+)ms")
+
+
+@lru_cache(maxsize=1)
+def _get_bash_scripts_tarball() -> bytes:
+    """Builds a gzipped tarball of both bash scripts once and caches it, so transferring the
+    scripts to every instance reuses the same bytes."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tarball:
+        for bash_script in (PERFORM_MEASUREMENTS_BASH_SCRIPT, SETUP_CRON_BASH_SCRIPT):
+            tarball.add("bash_scripts/" + bash_script, arcname=bash_script)
+    return buffer.getvalue()
 
 
 class Orchestrator:
@@ -50,7 +71,6 @@ class Orchestrator:
     ]
     # Used as a timeout for both the creation of the file and for the completion of all operations
     RESULTS_TIMEOUT_SEC = 600
-    RESULTS_INTERVAL_SEC = 5
 
     def __init__(
         self,
@@ -69,50 +89,82 @@ class Orchestrator:
         self._instances_to_create: List[InstanceToCreate] = (
             instances_to_create if instances_to_create else type(self).DEFAULT_INSTANCES_TO_CREATE
         )
-        # A list of dictionaries where each dict contains the created instance object together with
-        # the username to log on the instance with
-        self.created_instances: List[Dict] = []
-        # A dictionary where keys are instance IDs and values - SSH client objects related to the
-        # those instance IDs
-        self.established_ssh_connections: Dict = {}
+        # A list of records where each record contains the created instance object, the username to
+        # log on the instance with, and the SSH/SCP clients of the active session. Each record is
+        # only ever mutated by the single thread running the flow of its instance, so no locking
+        # is needed
+        self.created_instances: List[InstanceRecord] = []
+        # A dictionary where keys are instance IDs and values - the InstanceInformation gathered
+        # for those instances, so re-runs and retries do not repeat the DescribeInstances API call
+        self._instance_information_cache: Dict = {}
 
     def __enter__(self) -> Orchestrator:
         """Creates the VMs based on the AMIs provided in self.instances_to_create,
         establishes an SSH connection to each instance, and returns the class instance upon
-        entering the class as a context manager."""
-        for instance_to_create in self._instances_to_create:
-            instance = self.ec2.create_instance(
-                image_id=instance_to_create.ami_id,
-                key_name=instance_to_create.key_pair_name,
-                security_group_name=instance_to_create.security_group_name,
-            )
-            logging.info(
-                "Successfully established a SSH connection to instance: %s with public DNS of: %s.",
-                instance.id,
-                instance.public_dns_name,
-            )
-            self.created_instances.append(
-                {"instance": instance, "username": instance_to_create.username.value}
-            )
+        entering the class as a context manager. The instances get created in parallel as each
+        creation spends almost all of its time waiting for the instance to pass its status
+        checks."""
+        with ThreadPoolExecutor(max_workers=len(self._instances_to_create)) as executor:
+            futures = [
+                (
+                    executor.submit(
+                        self.ec2.create_instance,
+                        image_id=instance_to_create.ami_id,
+                        key_name=instance_to_create.key_pair_name,
+                        security_group_name=instance_to_create.security_group_name,
+                    ),
+                    instance_to_create,
+                )
+                for instance_to_create in self._instances_to_create
+            ]
+            for future, instance_to_create in futures:
+                instance = future.result()
+                logging.info(
+                    "Successfully established a SSH connection to instance: %s with public DNS of:"
+                    " %s.",
+                    instance.id,
+                    instance.public_dns_name,
+                )
+                self.created_instances.append(
+                    InstanceRecord(
+                        instance=instance,
+                        username=instance_to_create.username.value,
+                        # The private key is parsed once here so every connect to the instance
+                        # reuses the key object instead of re-reading the .pem file
+                        pkey=paramiko.RSAKey.from_private_key_file(instance.key_name + ".pem"),
+                    )
+                )
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Closes all SSH sessions, terminates all created EC2 instances, deletes their security
-        group and key pairs upon exiting the context manager."""
-        for instance in self.created_instances:
-            if instance["instance"].id in self.established_ssh_connections:
-                self.established_ssh_connections[instance["instance"].id]["ssh_client"].close()
-            logging.info(
-                "Successfully closed the SSH section of instance: %s.",
-                instance["instance"].id,
-            )
-            self.ec2.terminate_instance(instance_id=instance["instance"].id)
-            self.ec2.delete_security_group(
-                # Instances used by this class would only ever be part of one security group,
-                # hence the access to the 0th index specifically
-                group_id=instance["instance"].security_groups[0]["GroupId"]
-            )
-            self.ec2.delete_key_pair(key_name=instance["instance"].key_name)
+        group and key pairs upon exiting the context manager. The instances get torn down in
+        parallel as each teardown spends almost all of its time waiting for the instance to
+        terminate."""
+        if not self.created_instances:
+            return
+        with ThreadPoolExecutor(max_workers=len(self.created_instances)) as executor:
+            # Iterating the map result propagates any exception raised during a teardown
+            for _ in executor.map(self._teardown_instance, self.created_instances):
+                pass
+
+    def _teardown_instance(self, instance_record: InstanceRecord):
+        """Closes the SSH session of a single instance, terminates it, and deletes its security
+        group and key pair."""
+        if instance_record.ssh_client:
+            instance_record.scp_client.close()
+            instance_record.ssh_client.close()
+        logging.info(
+            "Successfully closed the SSH section of instance: %s.",
+            instance_record.instance.id,
+        )
+        self.ec2.teardown(
+            instance_id=instance_record.instance.id,
+            key_name=instance_record.instance.key_name,
+            # Instances used by this class would only ever be part of one security group,
+            # hence the access to the 0th index specifically
+            group_id=instance_record.instance.security_groups[0]["GroupId"],
+        )
 
     @staticmethod
     def _prepare_ssh_client_obj() -> paramiko.SSHClient:
@@ -129,74 +181,102 @@ class Orchestrator:
 
         return ssh_client
 
-    def connect_ssh(self, instance_obj, username: str) -> paramiko.SSHClient:
+    def connect_ssh(self, instance_record: InstanceRecord) -> paramiko.SSHClient:
         """Establishes an SSH connection to a given instance and returns a SSHClient object.
 
         Parameters
         ----------
-        instance_obj : ec2.Instance
-            The instance to connect to as an ec2.Instance object.
-        username : str
-            The username to connect as.
+        instance_record : InstanceRecord
+            The record of the instance to connect to. Its ssh_client and scp_client fields get
+            populated with the clients of the established session.
 
         Returns
         -------
         paramiko.SSHClient
         """
         ssh_client = Orchestrator._prepare_ssh_client_obj()
-        ssh_client.connect(
-            hostname=instance_obj.public_dns_name,
-            username=username,
-            key_filename=instance_obj.key_name + ".pem",
-        )
+        # compress=True makes paramiko propose zlib during the initial key exchange - the only
+        # point at which compression can be negotiated - which speeds up the SCP transfers
+        # performed over the session, especially across regions
+        if instance_record.pkey:
+            # look_for_keys/allow_agent are disabled as the exact key is already known, which
+            # short-circuits paramiko's default key discovery
+            ssh_client.connect(
+                hostname=instance_record.instance.public_dns_name,
+                username=instance_record.username,
+                pkey=instance_record.pkey,
+                look_for_keys=False,
+                allow_agent=False,
+                compress=True,
+            )
+        else:
+            ssh_client.connect(
+                hostname=instance_record.instance.public_dns_name,
+                username=instance_record.username,
+                key_filename=instance_record.instance.key_name + ".pem",
+                compress=True,
+            )
         logging.info(
             "Successfully connected via SSH to instance: %s with public DNS of: %s.",
-            instance_obj.id,
-            instance_obj.public_dns_name,
+            instance_record.instance.id,
+            instance_record.instance.public_dns_name,
         )
-        self.established_ssh_connections[instance_obj.id] = {
-            "ssh_client": ssh_client,
-            "username": username,
-        }
+        transport = ssh_client.get_transport()
+        # Larger flow-control window/packet sizes than the paramiko defaults speed up the bulk
+        # transfers on the channels opened later over this session
+        transport.default_window_size = 4 * 1024 * 1024
+        transport.default_max_packet_size = 256 * 1024
+        # Keepalives prevent the session from being reaped by NAT gateways during the long idle
+        # stretches while the instance runs the measurements
+        transport.set_keepalive(15)
+        instance_record.ssh_client = ssh_client
+        # One SCP client is kept per connection so every transfer reuses it instead of paying the
+        # channel setup cost again
+        instance_record.scp_client = SCPClient(ssh_client.get_transport())
+        if not instance_record.hostname:
+            # The hostname is read once per instance here so transferring results does not pay a
+            # round-trip for it every time
+            instance_record.hostname = (
+                ssh_client.exec_command("cat /etc/hostname")[1].readline().strip()
+            )
 
         return ssh_client
 
-    def transfer_bash_scripts_to_instance(
+    def _get_instance_record(
         self, instance_ssh_client: paramiko.SSHClient
-    ) -> Orchestrator:
-        """Transfers both bash scripts - the perform operations one and the setup cron one,
-        to the instance related to the SSH session passed to instance_ssh_client."""
-        scp = SCPClient(instance_ssh_client.get_transport())
-        for bash_script in (PERFORM_MEASUREMENTS_BASH_SCRIPT, SETUP_CRON_BASH_SCRIPT):
-            # Give the file full access by anyone to avoid any permission issues whatsoever
-            os.chmod("bash_scripts/" + bash_script, 0o0777)
-            # Transfer the script over to the instance at the home of the default user
-            scp.put("bash_scripts/" + bash_script)
-
-        return self
-
-    def run_setup_cron_bash_script(self, instance_ssh_client: paramiko.SSHClient) -> Orchestrator:
-        """Runs the setup cron bash script on the instance related to the SSH session passed to
-        the parameter instance_ssh_client."""
-        instance_ssh_client.exec_command(f"./{SETUP_CRON_BASH_SCRIPT}")
-        return self
-
-    def wait_for_results_file_to_be_created(
+    ) -> Optional[InstanceRecord]:
+        """Returns the record of the instance related to the SSH session passed to
+        instance_ssh_client, or None if no record holds that session."""
+        for record in self.created_instances:
+            if record.ssh_client is instance_ssh_client:
+                return record
+        return None
+
+    def _get_scp_client(self, instance_ssh_client: paramiko.SSHClient) -> SCPClient:
+        """Returns the cached SCP client related to the SSH session passed to instance_ssh_client,
+        or a new one if the session has no cached SCP client."""
+        record = self._get_instance_record(instance_ssh_client=instance_ssh_client)
+        if record:
+            return record.scp_client
+        return SCPClient(instance_ssh_client.get_transport())
+
+    def setup_instance_for_measurements(
         self, instance_ssh_client: paramiko.SSHClient
     ) -> Orchestrator:
-        """Waits for the results file to be created on an instance specified by its SSH client,
-        which is passed to the parameter instance_ssh_client."""
-        timeout = time.time() + type(self).RESULTS_TIMEOUT_SEC
-        while (
-            # stderr is at the last index of exec_command's returned 3-tuple
-            instance_ssh_client.exec_command(f"cat {RESULTS_FILENAME}")[-1].readline()
-            and time.time() < timeout
-        ):
-            time.sleep(type(self).RESULTS_INTERVAL_SEC)
-
-        if time.time() > timeout:
-            raise UserWarning("Could not wait for the results file to be created!")
-        logging.info("Successfully waited for the results file to be created!")
+        """Transfers both bash scripts - the perform operations one and the setup cron one, to the
+        instance related to the SSH session passed to instance_ssh_client, and runs the setup cron
+        one. The scripts travel as a gzipped tarball written to the stdin of a single remote
+        pipeline that unpacks them at the home of the default user, makes them executable, and
+        configures the cron job, so the whole setup costs one SSH round-trip instead of one per
+        script plus one for the cron setup."""
+        stdin = instance_ssh_client.exec_command(
+            f"tar xzf - && chmod +x *.sh && ./{SETUP_CRON_BASH_SCRIPT}"
+        )[0]
+        stdin.write(_get_bash_scripts_tarball())
+        stdin.channel.shutdown_write()
+        # Wait for the remote pipeline to finish so the subsequent reboot cannot race the cron
+        # setup
+        stdin.channel.recv_exit_status()
 
         return self
 
@@ -204,28 +284,41 @@ class Orchestrator:
         self, instance_ssh_client: paramiko.SSHClient
     ) -> Orchestrator:
         """Waits for all operations to complete on an instance specified by its SSH client,
-        which is passed to the parameter instance_ssh_client."""
-        self.wait_for_results_file_to_be_created(instance_ssh_client=instance_ssh_client)
-
-        timeout = time.time() + type(self).RESULTS_TIMEOUT_SEC
-        while (
-            # The word DONE is always the last line of a results file when measurements are done
-            "DONE"
-            not in instance_ssh_client.exec_command(f"cat {RESULTS_FILENAME}")[
-                1  # stdin
-            ].readlines()[-1]
-            and time.time() < timeout
-        ):
-            time.sleep(type(self).RESULTS_INTERVAL_SEC)
-
-        if time.time() > timeout:
-            raise UserWarning("Could not wait for all operations to be performed!")
+        which is passed to the parameter instance_ssh_client.
+
+        The wait happens over a single long-lived channel running `tail -F` against the results
+        file, so newly appended lines arrive as soon as the kernel flushes them instead of being
+        detected on the next polling interval. `tail -F` also retries until the file exists, which
+        covers waiting for the file to be created in the first place."""
+        # -n +1 so the whole file gets streamed even if the measurements finished before the
+        # channel was opened
+        stdout = instance_ssh_client.exec_command(f"tail -n +1 -F {RESULTS_FILENAME} 2>/dev/null")[
+            1  # stdout
+        ]
+        channel = stdout.channel
+        # time.monotonic is immune to wall-clock adjustments, so the deadline cannot jump
+        deadline = time.monotonic() + type(self).RESULTS_TIMEOUT_SEC
+        streamed = ""
+        # The word DONE is always the last line of a results file when measurements are done
+        while "DONE" not in streamed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([channel], [], [], remaining)[0]:
+                channel.close()
+                raise UserWarning("Could not wait for all operations to be performed!")
+            data = channel.recv(4096)
+            if not data:
+                # An empty read means EOF - the remote tail exited or the connection dropped, so
+                # more data can never arrive and waiting out the deadline would just spin
+                channel.close()
+                raise UserWarning("The results stream ended before all operations were performed!")
+            streamed += data.decode()
+        channel.close()
         logging.info("Successfully waited for all filesystem operations to complete")
 
         return self
 
-    @staticmethod
     def transfer_results_to_orchestrator_host(
+        self,
         instance_ssh_client: paramiko.SSHClient,
     ) -> str:
         """Transfers the results.txt file from the instance to the orchestrator host in the
@@ -236,8 +329,14 @@ class Orchestrator:
         str
             The name of the transferred results file.
         """
-        scp = SCPClient(instance_ssh_client.get_transport())
-        hostname = instance_ssh_client.exec_command("cat /etc/hostname")[1].readline().strip()
+        scp = self._get_scp_client(instance_ssh_client=instance_ssh_client)
+        record = self._get_instance_record(instance_ssh_client=instance_ssh_client)
+        # The hostname is cached on the record at connect time; the round-trip below only happens
+        # for sessions the orchestrator does not track
+        if record and record.hostname:
+            hostname = record.hostname
+        else:
+            hostname = instance_ssh_client.exec_command("cat /etc/hostname")[1].readline().strip()
         target_filename = f"{hostname}-{RESULTS_FILENAME}"
         scp.get(RESULTS_FILENAME, target_filename)
         logging.info("Transferred the results file from the instance to the orchestrator host!")
@@ -250,10 +349,12 @@ class Orchestrator:
         operations measurements."""
         measurements = {}
         with open(filename, "r") as f:
-            results_file_content = f.readlines()
-            # 0:-1 to exclude the last line, which is the DONE signal
-            for line in results_file_content[0:-1]:
-                operation, elapsed = match(r"([A-Z]+): ([0-9]+)ms", line).groups()
+            # The file gets iterated lazily instead of materializing all lines at once
+            for line in f:
+                # The DONE signal is always the last line of a results file
+                if line.startswith("DONE"):
+                    break
+                operation, elapsed = RESULTS_LINE_REGEX.match(line).groups()
                 measurements[operation] = elapsed
         # Delete the file after retrieving the results from it
         os.remove(filename)
@@ -264,14 +365,14 @@ class Orchestrator:
             delete_elapsed_ms=int(measurements["DELETE"]),
         )
 
-    def run_e2e_flow(self, instance) -> Dict:
+    def run_e2e_flow(self, instance_record: InstanceRecord) -> Dict:
         """Runs the end to end flow, which goes through all steps to run the operations measurements
          on a given instance and retrieve the results from the instance to the orchestrator host.
 
         Parameters
         ----------
-        instance : ec2.Instance
-            The ec2.Instance object where the operations measurements are to be performed and
+        instance_record : InstanceRecord
+            The record of the instance where the operations measurements are to be performed and
             retrieved from.
 
         Returns
@@ -280,21 +381,24 @@ class Orchestrator:
             A dictionary containing two key-value pairs: the parsed operations measurements and
             the instance information.
         """
-        ssh = self.connect_ssh(instance_obj=instance["instance"], username=instance["username"])
-        self.transfer_bash_scripts_to_instance(instance_ssh_client=ssh).run_setup_cron_bash_script(
-            instance_ssh_client=ssh
-        ).ec2.reboot_instance(
-            instance_obj=instance["instance"],
+        ssh = self.connect_ssh(instance_record=instance_record)
+        self.setup_instance_for_measurements(instance_ssh_client=ssh).ec2.reboot_instance(
+            instance_obj=instance_record.instance,
             ssh_client=ssh,
-            username=instance["username"],
+            username=instance_record.username,
         )
 
-        ssh = self.connect_ssh(instance_obj=instance["instance"], username=instance["username"])
+        ssh = self.connect_ssh(instance_record=instance_record)
         results_filename = self.wait_for_all_operations_to_complete(
             instance_ssh_client=ssh
         ).transfer_results_to_orchestrator_host(instance_ssh_client=ssh)
 
         measurements = self.get_measurements_from_file(filename=results_filename)
-        instance_info = self.ec2.get_instance_information(instance=instance["instance"])
+        instance_id = instance_record.instance.id
+        if instance_id not in self._instance_information_cache:
+            self._instance_information_cache[instance_id] = self.ec2.get_instance_information(
+                instances=instance_record.instance
+            )[0]
+        instance_info = self._instance_information_cache[instance_id]
 
         return {"measurements": measurements, "instance_info": instance_info}
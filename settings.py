@@ -1,23 +1,33 @@
 """This module contains common settings across the project"""
 import os
 from logging import INFO
+from typing import NamedTuple, Optional
 
 LOGGING_LEVEL = INFO
+# Size of the botocore HTTP connection pool; sized for many parallel instance operations
+EC2_MAX_POOL_CONNECTIONS = 50
 PERFORM_MEASUREMENTS_BASH_SCRIPT = "perform_measurements.sh"
 SETUP_CRON_BASH_SCRIPT = "setup_cron.sh"
 RESULTS_FILENAME = "results.txt"
 
 
-class DefaultAWSEC2Credentials:
-    """This class contains default credentials for establishing a connection to AWS EC2. If the
-    appropriate environment variables exist, they are used instead.
+class _AWSEC2Credentials(NamedTuple):
+    """Contains default credentials for establishing a connection to AWS EC2. Any value left unset
+    in the environment stays None, in which case boto3 resolves it through its default credential
+    chain (shared credentials file, instance profile, and so on).
 
     Note: A valid IAM user is required in order to have an eligible access key ID and secret
     access key.
     """
 
-    DEFAULT_AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID", "default_access_key_id")
-    DEFAULT_AWS_SECRET_ACCESS_KEY = os.getenv(
-        "AWS_SECRET_ACCESS_KEY", "default_secret_access_key"
-    )
-    DEFAULT_AWS_REGION = os.getenv("AWS_REGION", "default_aws_region")
+    access_key_id: Optional[str]
+    secret_access_key: Optional[str]
+    region: Optional[str]
+
+
+# The environment variables are read once at import time and frozen into an immutable tuple
+DEFAULT_AWS_EC2_CREDENTIALS = _AWSEC2Credentials(
+    access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+    secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+    region=os.getenv("AWS_REGION"),
+)
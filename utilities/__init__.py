@@ -1,11 +1,22 @@
 """__init__ for utilities/"""
-from utilities.aws_ec2 import EC2
 from utilities.enums_dataclasses import (
     AWSEC2FreeTierAMIs,
     AWSServices,
     DefaultAMIUsernames,
     InstanceInformation,
     InstanceOperationsMeasurements,
+    InstanceRecord,
     InstanceToCreate,
 )
 from utilities.results_formatter import ResultsFormatter
+
+
+def __getattr__(name):
+    """Lazily resolves the EC2 class (PEP 562), so importing the package only for the formatter
+    or the dataclasses does not pay the boto3 import cost behind utilities.aws_ec2."""
+    if name == "EC2":
+        # pylint: disable=import-outside-toplevel
+        from utilities.aws_ec2 import EC2
+
+        return EC2
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,28 +1,84 @@
 """This module contains utility functions for operating with AWS EC2."""
+from __future__ import annotations
+
 import logging
 import os
+import pathlib
+import secrets
+import socket
 import stat
 import time
-from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
-import boto3
-import paramiko
 from botocore.config import Config
 from botocore.exceptions import ClientError
 
-from settings import LOGGING_LEVEL, DefaultAWSEC2Credentials
+if TYPE_CHECKING:
+    import paramiko
+
+from settings import DEFAULT_AWS_EC2_CREDENTIALS, EC2_MAX_POOL_CONNECTIONS
+from utilities import logging_setup  # noqa: F401  pylint: disable=unused-import
 from utilities.enums_dataclasses import (
     AWSEC2FreeTierAMIs,
     AWSEC2FreeTierInstanceTypes,
     AWSServices,
     InstanceInformation,
+    InstanceToCreate,
 )
 
-logging.basicConfig(level=LOGGING_LEVEL)
+# Keys are (access key ID, secret access key, region, config repr) tuples and values -
+# (Session, ServiceResource) tuples, so EC2 objects with the same credentials share one session
+# and resource instead of paying the service-model loading and SSL context setup again
+_SHARED_SESSIONS: Dict = {}
+
+
+def _get_config_repr(config: Config) -> Tuple:
+    """Returns a hashable representation of a botocore Config, usable as part of a cache key."""
+    # pylint: disable=protected-access
+    return tuple(
+        sorted((option, str(value)) for option, value in config._user_provided_options.items())
+    )
+
+
+def _get_session_and_resource(
+    aws_access_key_id: str, aws_secret_access_key: str, aws_region_name: str, config: Config
+) -> Tuple:
+    """Returns a (Session, ServiceResource) tuple for the given credentials and config, creating
+    and caching it on first use and returning the shared one afterwards.
+
+    Returns
+    -------
+    Tuple
+        A tuple containing two elements: the boto3 Session at index 0 and the EC2 service
+        resource at index 1.
+    """
+    # boto3 is imported lazily as its import loads the service models and takes hundreds of
+    # milliseconds, which importers of the lightweight parts of this package should not pay
+    # pylint: disable=import-outside-toplevel
+    import boto3
+
+    key = (aws_access_key_id, aws_secret_access_key, aws_region_name, _get_config_repr(config))
+    if key not in _SHARED_SESSIONS:
+        session = boto3.session.Session(
+            aws_access_key_id=aws_access_key_id,
+            aws_secret_access_key=aws_secret_access_key,
+            region_name=aws_region_name,
+        )
+        _SHARED_SESSIONS[key] = (session, session.resource(AWSServices.EC2.value, config=config))
+    return _SHARED_SESSIONS[key]
 
 
 class EC2:
-    """The class serves as a utility class for AWS EC2 operations needed throughout this project."""
+    """The class serves as a utility class for AWS EC2 operations needed throughout this project.
+
+    Note: The default botocore Config enlarges the connection pool, enables standard-mode retries
+    (exponential backoff with jitter), and turns on TCP keepalive, so bursts of concurrent API
+    calls reuse pooled connections instead of fighting over botocore's default pool of 10. A
+    config passed by the caller is merged on top of these defaults, so individual options can
+    still be overridden.
+    """
 
     def __init__(
         self,
@@ -31,33 +87,33 @@ class EC2:
         aws_region_name: Optional[str] = None,
         config: Optional[Config] = None,
     ):
-        self.aws_access_key_id = (
-            aws_access_key_id
-            if aws_access_key_id
-            else DefaultAWSEC2Credentials.DEFAULT_AWS_ACCESS_KEY_ID
-        )
+        self.aws_access_key_id = aws_access_key_id or DEFAULT_AWS_EC2_CREDENTIALS.access_key_id
         self.aws_secret_access_key = (
-            aws_secret_access_key
-            if aws_secret_access_key
-            else DefaultAWSEC2Credentials.DEFAULT_AWS_SECRET_ACCESS_KEY
+            aws_secret_access_key or DEFAULT_AWS_EC2_CREDENTIALS.secret_access_key
         )
-        self.aws_region_name = (
-            aws_region_name if aws_region_name else DefaultAWSEC2Credentials.DEFAULT_AWS_REGION
+        self.aws_region_name = aws_region_name or DEFAULT_AWS_EC2_CREDENTIALS.region
+        default_config = Config(
+            region_name=self.aws_region_name,
+            max_pool_connections=EC2_MAX_POOL_CONNECTIONS,
+            retries={"max_attempts": 5, "mode": "standard"},
+            tcp_keepalive=True,
+            # Failing fast instead of hanging on botocore's 60s socket timeouts hands transient
+            # stalls to the retry mode rather than blocking a worker thread
+            connect_timeout=5,
+            read_timeout=30,
         )
-        self.config = config if config else Config(region_name=self.aws_region_name)
+        # Merging keeps the tuned defaults while letting the caller's options take precedence
+        self.config = default_config.merge(config) if config else default_config
 
-        self.resource = boto3.resource(
-            AWSServices.EC2.value,
-            aws_access_key_id=self.aws_access_key_id,
-            aws_secret_access_key=self.aws_secret_access_key,
-            config=self.config,
-        )
-        self.client = boto3.client(
-            AWSServices.EC2.value,
+        self.session, self.resource = _get_session_and_resource(
             aws_access_key_id=self.aws_access_key_id,
             aws_secret_access_key=self.aws_secret_access_key,
+            aws_region_name=self.aws_region_name,
             config=self.config,
         )
+        # The resource already carries a client, so reusing it avoids constructing a second one
+        # and guarantees both share the same endpoint and connection pool
+        self.client = self.resource.meta.client
 
     def create_key_pair(
         self, key_name: Optional[str] = None, key_file_name: Optional[str] = None
@@ -81,25 +137,46 @@ class EC2:
             index 1.
         """
         if not key_name:
-            key_name = f"key-pair-{hash(time.time())}"
+            key_name = f"key-pair-{secrets.token_hex(8)}"
         if not key_file_name:
             key_file_name = key_name + ".pem"
 
         try:
             key_pair = self.resource.create_key_pair(KeyName=key_name)
             logging.info("Created key: %s.", key_pair.name)
-            with open(key_file_name, "w") as f:
-                f.write(key_pair.key_material)
-                # Change the permissions of the key file to read by owner only to adjust to the
-                # security requirements of SSHing to an EC2 VM
-                os.chmod(key_file_name, stat.S_IRUSR)
-                logging.info("Wrote private key to file: %s.", key_file_name)
+            # The key file is created with read-by-owner-only permissions - as required for
+            # SSHing to an EC2 VM - applied atomically at creation, so the key material is never
+            # readable by anyone else, and O_EXCL guarantees a pre-existing file never gets
+            # silently overwritten. The material is plain ASCII, so it is written in one go
+            # without the text-mode encoding machinery
+            fd = os.open(key_file_name, os.O_WRONLY | os.O_CREAT | os.O_EXCL, stat.S_IRUSR)
+            try:
+                os.write(fd, key_pair.key_material.encode("ascii"))
+            finally:
+                os.close(fd)
+            logging.info("Wrote private key to file: %s.", key_file_name)
         except ClientError as exc:
             logging.exception("Couldn't create key: %s!", key_name)
             raise exc
         else:
             return key_pair, key_name
 
+    @cached_property
+    def _default_vpc(self):
+        """The default virtual private cloud (VPC) of the current account. The default VPC never
+        changes within an account and region, so it is fetched once and cached on the instance.
+
+        Returns
+        -------
+        ec2.Vpc
+        """
+        # The client call skips the resource-collection paginator machinery - one DescribeVpcs
+        # round-trip and one lightweight Vpc handle built from the returned ID
+        response = self.client.describe_vpcs(
+            Filters=[{"Name": "isDefault", "Values": ["true"]}], MaxResults=5
+        )
+        return self.resource.Vpc(response["Vpcs"][0]["VpcId"])
+
     def create_security_group_with_ssh(self, group_name: Optional[str] = None) -> Tuple:
         """Creates a security group in the default virtual private cloud (VPC) of the
         current account, then adds a rule to the security group to allow SSH access.
@@ -108,20 +185,31 @@ class EC2:
         ----------
         group_name : Optional[str]
             The name of the security group to create. Optional, if omitted - a unique name is
-            created.
+            created. If a group with the provided name already exists, it is reused as-is instead
+            of being recreated.
 
         Returns
         -------
         Tuple
             A tuple containing two elements: the security group object at index 0 and its name at 1.
         """
-        if not group_name:
-            group_name = f"security-group-{hash(time.time())}"
+        if group_name:
+            # Reusing an existing group of the same name turns the hot path into a single
+            # DescribeSecurityGroups round-trip instead of create + authorize, and keeps repeated
+            # runs against the same account from leaking groups
+            existing = list(
+                self.resource.security_groups.filter(
+                    Filters=[{"Name": "group-name", "Values": [group_name]}]
+                ).limit(1)
+            )
+            if existing:
+                logging.info("Reusing existing security group %s.", group_name)
+                return existing[0], group_name
+        else:
+            group_name = f"security-group-{secrets.token_hex(8)}"
         group_description = group_name + "-description"
 
-        default_vpc = list(
-            self.resource.vpcs.filter(Filters=[{"Name": "isDefault", "Values": ["true"]}])
-        )[0]
+        default_vpc = self._default_vpc
 
         try:
             security_group = default_vpc.create_security_group(
@@ -153,6 +241,8 @@ class EC2:
         key_name: Optional[str] = None,
         security_group_name: Optional[str] = None,
         wait_for_status_ok: bool = True,
+        waiter_poll_interval_sec: int = 5,
+        waiter_max_attempts: int = 90,
     ):
         """Creates a new Amazon EC2 instance. The instance automatically starts immediately after
         it is created.
@@ -169,20 +259,34 @@ class EC2:
             group part of the default VPC with SSH ingress traffic allowed if none is provided.
         wait_for_status_ok : bool
             Controls whether the function would wait for the instance to pass its status checks
-            before returning. The wait and poll interval times are the default ones for boto3 -
-            40 attempts each polled at 15s. Defaults To true.
+            before returning. Defaults To true.
+        waiter_poll_interval_sec : int
+            How often, in seconds, the status waiter polls. The 5s default is a finer granularity
+            than the boto3 default of 15s, so state changes are detected sooner.
+        waiter_max_attempts : int
+            The maximum number of waiter polls before giving up. The default of 90 keeps the same
+            overall ceiling as boto3's 40 attempts at 15s.
 
         Returns
         -------
         ec2.Instance
         """
 
-        key_name = key_name if key_name else self.create_key_pair()[1]
-        groups = (
-            security_group_name
-            if security_group_name
-            else [self.create_security_group_with_ssh()[1]]
-        )
+        if not key_name and not security_group_name:
+            # Creating the key pair and the security group are independent API round trips, so
+            # they get dispatched in parallel when both defaults are taken
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                key_pair_future = executor.submit(self.create_key_pair)
+                security_group_future = executor.submit(self.create_security_group_with_ssh)
+                key_name = key_pair_future.result()[1]
+                groups = [security_group_future.result()[1]]
+        else:
+            key_name = key_name if key_name else self.create_key_pair()[1]
+            groups = (
+                security_group_name
+                if security_group_name
+                else [self.create_security_group_with_ssh()[1]]
+            )
 
         try:
             instance_params = {
@@ -191,8 +295,11 @@ class EC2:
                 "KeyName": key_name,
                 "SecurityGroups": groups,
             }
-            instance = self.resource.create_instances(**instance_params, MinCount=1, MaxCount=1)[0]
-            logging.info("Created instance: %s.", instance.id)
+            # run_instances on the client skips the resource layer's per-call model parsing; a
+            # lightweight Instance handle is built from the returned ID only once, on return
+            response = self.client.run_instances(**instance_params, MinCount=1, MaxCount=1)
+            instance_id = response["Instances"][0]["InstanceId"]
+            logging.info("Created instance: %s.", instance_id)
         except ClientError as exc:
             logging.exception(
                 "Couldn't create instance with image %s, instance type %s, and key %s!",
@@ -205,12 +312,50 @@ class EC2:
             if wait_for_status_ok:
                 logging.info(
                     "Starting to wait for instance with ID: %s, to pass its status checks...",
-                    instance.id,
+                    instance_id,
+                )
+                self.client.get_waiter("instance_status_ok").wait(
+                    InstanceIds=[instance_id],
+                    WaiterConfig={
+                        "Delay": waiter_poll_interval_sec,
+                        "MaxAttempts": waiter_max_attempts,
+                    },
                 )
-                self.client.get_waiter("instance_status_ok").wait(InstanceIds=[instance.id])
-                logging.info("Instance with ID: %s, has passed its status checks!", instance.id)
+                logging.info("Instance with ID: %s, has passed its status checks!", instance_id)
 
-            return self.resource.Instance(id=instance.id)
+            return self.resource.Instance(id=instance_id)
+
+    def create_instances(self, specs: List[InstanceToCreate], wait_for_status_ok: bool = True):
+        """Creates multiple instances in parallel, one per spec. Each create_instance call blocks
+        on HTTPS round trips and waiters, so running them on a thread pool brings the wall-clock
+        cost down to roughly the slowest single creation. boto3 clients are thread-safe and the
+        connection pool is sized for this fan-out.
+
+        Parameters
+        ----------
+        specs : List[InstanceToCreate]
+            The specs of the instances to create.
+        wait_for_status_ok : bool
+            Controls whether each creation waits for the instance to pass its status checks.
+            Defaults to True.
+
+        Returns
+        -------
+        List[ec2.Instance]
+            The created instances, in the same order as the given specs.
+        """
+        with ThreadPoolExecutor(max_workers=len(specs)) as executor:
+            futures = [
+                executor.submit(
+                    self.create_instance,
+                    image_id=spec.ami_id,
+                    key_name=spec.key_pair_name,
+                    security_group_name=spec.security_group_name,
+                    wait_for_status_ok=wait_for_status_ok,
+                )
+                for spec in specs
+            ]
+            return [future.result() for future in futures]
 
     def reboot_instance(
         self,
@@ -253,38 +398,90 @@ class EC2:
             "Starting to wait for instance with ID: %s, to start rebooting...",
             instance_obj.id,
         )
-        timeout = time.time() + start_rebooting_timeout_sec
-        while time.time() < timeout:
-            try:
-                ssh_client.exec_command("pwd")
-            # pylint: disable=broad-except
-            except Exception:
-                break
-            else:
-                time.sleep(poll_interval_sec)
-        else:
+        deadline = time.monotonic() + start_rebooting_timeout_sec
+        transport = ssh_client.get_transport()
+        # The transport flips to inactive as soon as the server closes the connection, so checking
+        # it is a local in-process read instead of a remote command per poll
+        while time.monotonic() < deadline and transport and transport.is_active():
+            time.sleep(poll_interval_sec)
+        if transport and transport.is_active():
             raise UserWarning("Could not wait for the instance to start rebooting!")
+        # The server side is gone at this point, but the dead transport still holds its socket in
+        # CLOSE_WAIT until closed; closing it here frees the descriptor before the client is
+        # reused for the reconnect below
+        ssh_client.close()
 
         logging.info(
             "Starting to wait for instance with ID: %s, to finish rebooting...",
             instance_obj.id,
         )
-        timeout = time.time() + finish_rebooting_timeout_sec
-        while time.time() < timeout:
+        # Probing the TCP port first is much cheaper than attempting full SSH handshakes while
+        # sshd is still down, so the connect loop below starts only once the port accepts
+        # connections
+        self._wait_for_ssh_port(
+            hostname=instance_obj.public_dns_name,
+            timeout_sec=finish_rebooting_timeout_sec,
+            poll_interval_sec=poll_interval_sec,
+        )
+        # The private key is parsed once before the loop, so the retries reuse the key object
+        # instead of re-reading and re-decoding the .pem file on every attempt
+        # pylint: disable=import-outside-toplevel
+        import paramiko
+
+        pkey = paramiko.RSAKey.from_private_key_file(instance_obj.key_name + ".pem")
+        deadline = time.monotonic() + finish_rebooting_timeout_sec
+        while time.monotonic() < deadline:
             try:
                 ssh_client.connect(
                     hostname=instance_obj.public_dns_name,
                     username=username,
-                    key_filename=instance_obj.key_name + ".pem",
+                    pkey=pkey,
+                    look_for_keys=False,
+                    allow_agent=False,
+                    # Failed attempts while sshd is still coming up should fail fast instead of
+                    # hanging on paramiko's default timeouts
+                    timeout=poll_interval_sec,
+                    banner_timeout=poll_interval_sec,
+                    auth_timeout=poll_interval_sec,
                 )
             # pylint: disable=broad-except
             except Exception:
                 time.sleep(poll_interval_sec)
             else:
+                # Keepalives prevent the reestablished session from being reaped by NAT gateways
+                # during the long idle stretches while the measurements run
+                ssh_client.get_transport().set_keepalive(15)
                 break
         else:
             raise UserWarning("Could not wait for the instance to finish rebooting!")
 
+    @staticmethod
+    def _wait_for_ssh_port(
+        hostname: str, timeout_sec: int, poll_interval_sec: int = 1, port: int = 22
+    ):
+        """Waits for the SSH port of a given host to accept TCP connections.
+
+        Parameters
+        ----------
+        hostname : str
+            The hostname to probe.
+        timeout_sec : int
+            The timeout, in seconds, to wait for the port to accept connections.
+        poll_interval_sec : int
+            The interval, in seconds, to wait between probes.
+        port : int
+            The port to probe. Defaults to the SSH one.
+        """
+        deadline = time.monotonic() + timeout_sec
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection((hostname, port), timeout=2).close()
+            except OSError:
+                time.sleep(poll_interval_sec)
+            else:
+                return
+        raise UserWarning("Could not wait for the SSH port of the instance to open!")
+
     def delete_key_pair(self, key_name: str, key_file_name: Optional[str] = None):
         """Deletes a key pair and the specified private key file.
 
@@ -299,7 +496,9 @@ class EC2:
         self.resource.KeyPair(key_name).delete()
         if not key_file_name:
             key_file_name = key_name + ".pem"
-        os.remove(key_file_name)
+        # missing_ok keeps teardown idempotent - a retry after the file is already gone should
+        # not raise once the key pair itself has been deleted remotely
+        pathlib.Path(key_file_name).unlink(missing_ok=True)
         logging.info("Deleted key %s and private key file %s.", key_name, key_file_name)
 
     def delete_security_group(self, group_id: str):
@@ -313,43 +512,137 @@ class EC2:
         self.resource.SecurityGroup(group_id).delete()
         logging.info("Deleted security group %s.", group_id)
 
-    def terminate_instance(self, instance_id: str, wait_for_termination: bool = True):
-        """Terminates an instance. The request returns immediately. To wait for the
-        instance to terminate, use Instance.wait_until_terminated().
+    def teardown(
+        self,
+        instance_id: str,
+        key_name: str,
+        group_id: str,
+        key_file_name: Optional[str] = None,
+    ):
+        """Tears down an instance together with its key pair and security group. The termination
+        and the key pair deletion are independent, so they run in parallel; the security group can
+        only be deleted once the instance no longer uses it, so its deletion follows the
+        termination wait.
+
+        Parameters
+        ----------
+        instance_id : str
+            The ID of the instance to terminate.
+        key_name : str
+            The name of the key pair to delete.
+        group_id : str
+            The ID of the security group to delete.
+        key_file_name : Optional[str]
+            The local file name of the private key file. Optional, the key_name + '.pem' is deleted
+            if not provided.
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            terminate_future = executor.submit(self.terminate_instance, instance_id=instance_id)
+            key_pair_future = executor.submit(
+                self.delete_key_pair, key_name=key_name, key_file_name=key_file_name
+            )
+            terminate_future.result()
+            key_pair_future.result()
+        self.delete_security_group(group_id=group_id)
+
+    def terminate_instance(
+        self,
+        instance_id: str,
+        wait_for_termination: bool = True,
+        waiter_poll_interval_sec: int = 5,
+        waiter_max_attempts: int = 90,
+    ):
+        """Terminates an instance.
 
         Parameters
         ----------
         instance_id : str
             The ID of the instance to terminate.
         wait_for_termination : bool
-            Controls whether the method waits for the termination of the instance or not. Defaults
-            to True
+            Controls whether the method waits for the termination of the instance or not.
+            Defaults to True
+        waiter_poll_interval_sec : int
+            How often, in seconds, the termination waiter polls. Defaults to 5s, the same
+            granularity as the status checks wait in create_instance.
+        waiter_max_attempts : int
+            The maximum number of waiter polls before giving up. Defaults to 90.
         """
-        logging.info("Terminating instance: %s...", instance_id)
-        instance = self.resource.Instance(instance_id)
-        instance.terminate()
+        self.terminate_instances(
+            instance_ids=[instance_id],
+            wait_for_termination=wait_for_termination,
+            waiter_poll_interval_sec=waiter_poll_interval_sec,
+            waiter_max_attempts=waiter_max_attempts,
+        )
+
+    def terminate_instances(
+        self,
+        instance_ids: List[str],
+        wait_for_termination: bool = True,
+        waiter_poll_interval_sec: int = 5,
+        waiter_max_attempts: int = 90,
+    ):
+        """Terminates multiple instances with a single TerminateInstances call. The EC2 API
+        accepts up to 1000 IDs per call, so terminating N instances costs one round trip instead
+        of N, and a single waiter covers all of them.
+
+        Parameters
+        ----------
+        instance_ids : List[str]
+            The IDs of the instances to terminate.
+        wait_for_termination : bool
+            Controls whether the method waits for the termination of the instances or not.
+            Defaults to True
+        waiter_poll_interval_sec : int
+            How often, in seconds, the termination waiter polls. Defaults to 5s.
+        waiter_max_attempts : int
+            The maximum number of waiter polls before giving up. Defaults to 90.
+        """
+        logging.info("Terminating instances: %s...", ", ".join(instance_ids))
+        self.client.terminate_instances(InstanceIds=instance_ids)
         if wait_for_termination:
             logging.info(
-                "Starting to wait for instance with ID: %s, to be Terminated...",
-                instance.id,
+                "Starting to wait for instances with IDs: %s, to be Terminated...",
+                ", ".join(instance_ids),
+            )
+            self.client.get_waiter("instance_terminated").wait(
+                InstanceIds=instance_ids,
+                WaiterConfig={
+                    "Delay": waiter_poll_interval_sec,
+                    "MaxAttempts": waiter_max_attempts,
+                },
             )
-            instance.wait_until_terminated()
-        logging.info("Instance with ID: %s, has been terminated!", instance.id)
+        logging.info("Instances with IDs: %s, have been terminated!", ", ".join(instance_ids))
 
-    @staticmethod
-    def get_instance_information(instance) -> InstanceInformation:
-        """Gathers information about a given instance and returns it as a dictionary. The method
-        gathers the following information: ID, image ID, platform details, and architecture of the
-        instance.
+    def get_instance_information(self, instances) -> List[InstanceInformation]:
+        """Gathers information about the given instances and returns it as a list. The method
+        gathers the following information per instance: ID, image ID, platform details, and
+        architecture. All instances are covered by a single DescribeInstances call, so the cost
+        stays one round trip regardless of how many instances are passed.
+
+        Parameters
+        ----------
+        instances
+            A single ec2.Instance object or a list of such objects.
 
         Returns
         -------
-        InstanceInformation
-            A dataclass containing the instance information.
+        List[InstanceInformation]
+            A list of dataclasses containing the information of each instance.
         """
-        return InstanceInformation(
-            id=instance.id,
-            image_id=instance.image_id,
-            architecture=instance.architecture,
-            platform=instance.platform_details,
+        if not isinstance(instances, list):
+            instances = [instances]
+        response = self.client.describe_instances(
+            InstanceIds=[instance.id for instance in instances]
         )
+        information = []
+        for reservation in response["Reservations"]:
+            for described_instance in reservation["Instances"]:
+                information.append(
+                    InstanceInformation(
+                        id=described_instance["InstanceId"],
+                        image_id=described_instance["ImageId"],
+                        architecture=described_instance["Architecture"],
+                        platform=described_instance["PlatformDetails"],
+                    )
+                )
+        return information
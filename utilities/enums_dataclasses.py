@@ -1,7 +1,13 @@
 """This module contains common Enum classes used within the project."""
+from __future__ import annotations
+
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    import paramiko
+    from scp import SCPClient
 
 
 class AWSServices(Enum):
@@ -32,9 +38,12 @@ class AWSEC2FreeTierInstanceTypes(Enum):
     T2_MICRO = "t2.micro"
 
 
-@dataclass
+@dataclass(frozen=True)
 class InstanceInformation:
-    """Contains relevant information regarding a given EC2 instance."""
+    """Contains relevant information regarding a given EC2 instance. The class is slotted and
+    frozen as many such records can be built over a measurement run and none is ever mutated."""
+
+    __slots__ = ("id", "platform", "image_id", "architecture")
 
     id: str
     platform: str
@@ -42,15 +51,32 @@ class InstanceInformation:
     architecture: str
 
 
-@dataclass
+@dataclass(frozen=True)
 class InstanceOperationsMeasurements:
-    """Contains the operations measurement results."""
+    """Contains the operations measurement results. The class is slotted and frozen as many such
+    records can be built over a measurement run and none is ever mutated."""
+
+    __slots__ = ("create_elapsed_ms", "copy_elapsed_ms", "delete_elapsed_ms")
 
     create_elapsed_ms: int
     copy_elapsed_ms: int
     delete_elapsed_ms: int
 
 
+@dataclass
+class InstanceRecord:
+    """Contains the per-instance state kept by the orchestrator throughout its flow: the
+    ec2.Instance object, the username to log on the instance with, the SSH and SCP clients of
+    the currently active session, if any, and the hostname of the instance, once known."""
+
+    instance: Any
+    username: str
+    ssh_client: Optional[paramiko.SSHClient] = None
+    scp_client: Optional[SCPClient] = None
+    hostname: Optional[str] = None
+    pkey: Optional[paramiko.PKey] = None
+
+
 @dataclass
 class InstanceToCreate:
     """Contains information about a given instance to be created."""
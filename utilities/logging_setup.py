@@ -0,0 +1,8 @@
+"""This module configures the root logger for the project. Importing it anywhere runs
+logging.basicConfig exactly once per process, so the individual modules do not each need to
+re-walk the root handler list at import time."""
+import logging
+
+from settings import LOGGING_LEVEL
+
+logging.basicConfig(level=LOGGING_LEVEL)
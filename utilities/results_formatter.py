@@ -2,11 +2,29 @@
 operations measurements info and prints the formatted results."""
 import json
 import logging
+from dataclasses import asdict
+from typing import Optional
 
-from settings import LOGGING_LEVEL
+try:
+    # orjson serializes in C and is noticeably faster on large result sets; the stdlib json
+    # module stays as a drop-in fallback when it is not installed
+    import orjson
+except ImportError:
+    orjson = None
+
+from utilities import logging_setup  # noqa: F401  pylint: disable=unused-import
 from utilities.enums_dataclasses import InstanceInformation, InstanceOperationsMeasurements
 
-logging.basicConfig(level=LOGGING_LEVEL)
+# The template is built once at import time; the fields are named after the dataclass fields
+# they are filled from
+_HUMAN_FRIENDLY_RESULTS_TEMPLATE = (
+    "The following operations were performed on a set of 1000 files, each 1MB "
+    "in size, on an instance with ID {id} and image ID {image_id}: 1) Creating the files "
+    "took {create_elapsed_ms} milliseconds; 2) Copying the files from one directory to "
+    "another took {copy_elapsed_ms} milliseconds; 3) Deleting the files took "
+    "{delete_elapsed_ms} milliseconds. The platform of the instance is {platform} and "
+    "its architecture is {architecture}."
+)
 
 
 class ResultsFormatter:
@@ -22,50 +40,47 @@ class ResultsFormatter:
         self.instance_info = instance_information
         self.operations_measurements = operations_measurements
         self.human_readable = human_readable
+        self._formatted_results: Optional[str] = None
 
     def format_results(self) -> str:
         """Formats the results and returns them as either a JSON formatted string or a free-form
-        string, depending on the value of the attribute human_readable.
+        string, depending on the value of the attribute human_readable. Both inputs are frozen
+        dataclasses, so the formatted string is built once and cached for repeat calls.
         """
+        if self._formatted_results is not None:
+            return self._formatted_results
         if self.human_readable:
-            results = ResultsFormatter.get_human_friendly_results_template().format(
-                self.instance_info.id,
-                self.instance_info.image_id,
-                self.operations_measurements.create_elapsed_ms,
-                self.operations_measurements.copy_elapsed_ms,
-                self.operations_measurements.delete_elapsed_ms,
-                self.instance_info.platform,
-                self.instance_info.architecture,
-            )
+            # The mapping is built straight from the dataclass fields, so the template stays in
+            # sync with the schema by name instead of by argument position
+            mapping = {
+                **asdict(self.instance_info),
+                **asdict(self.operations_measurements),
+            }
+            results = ResultsFormatter.get_human_friendly_results_template().format_map(mapping)
         else:
-            results = json.dumps(
-                {
-                    self.instance_info.id: {
-                        "instance_information": {
-                            "image_id": self.instance_info.image_id,
-                            "platform": self.instance_info.platform,
-                            "architecture": self.instance_info.architecture,
-                        },
-                        "operations_measurements_milliseconds": {
-                            "create": self.operations_measurements.create_elapsed_ms,
-                            "copy": self.operations_measurements.copy_elapsed_ms,
-                            "delete": self.operations_measurements.delete_elapsed_ms,
-                        },
-                    }
+            payload = {
+                self.instance_info.id: {
+                    "instance_information": {
+                        "image_id": self.instance_info.image_id,
+                        "platform": self.instance_info.platform,
+                        "architecture": self.instance_info.architecture,
+                    },
+                    "operations_measurements_milliseconds": {
+                        "create": self.operations_measurements.create_elapsed_ms,
+                        "copy": self.operations_measurements.copy_elapsed_ms,
+                        "delete": self.operations_measurements.delete_elapsed_ms,
+                    },
                 }
-            )
+            }
+            results = orjson.dumps(payload).decode() if orjson else json.dumps(payload)
 
         logging.info("Formatted the following results: %s", results)
+        self._formatted_results = results
         return results
 
     @staticmethod
     def get_human_friendly_results_template() -> str:
-        """Returns a template string for outputting the measurements results in a human friendly
-        format, which in this case is just free-form text."""
-        return (
-            "The following operations were performed on a set of 1000 files, each 1MB "
-            "in size, on an instance with ID {} and image ID {}: 1) Creating the files took "
-            "{} milliseconds; 2) Copying the files from one directory to another took {} "
-            "milliseconds; 3) Deleting the files took {} milliseconds. The platform of the "
-            "instance is {} and its architecture is {}."
-        )
+        """Returns the template string for outputting the measurements results in a human friendly
+        format, which in this case is just free-form text. The template itself is a module-level
+        constant built once at import time."""
+        return _HUMAN_FRIENDLY_RESULTS_TEMPLATE